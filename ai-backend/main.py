@@ -1,32 +1,96 @@
 import os
+import re
 import json
-from datetime import date
-
+import asyncio
+import logging
+import logging.handlers
+import queue
+import secrets
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Literal, Optional
+
+import httpx
+import orjson
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from openai import OpenAI
+from pydantic import BaseModel, Field, field_validator
+from openai import AsyncOpenAI
 
 # ---------- Setup ----------
 
 load_dotenv()  # load .env if present
 
+# Log records go through a queue and are written by a background thread, so
+# request handlers never block on stdout.
+logger = logging.getLogger("voice_todo")
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.propagate = False
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+log_listener = logging.handlers.QueueListener(_log_queue, _stream_handler)
+log_listener.start()
+
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
   raise RuntimeError("OPENAI_API_KEY is not set")
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+# One pooled HTTP/2 client shared by every request, so the TLS handshake is
+# paid once and concurrent calls multiplex over the same connection.
+http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    timeout=30,
+)
+client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
+
+# Optional semantic cache (paraphrase matching with local embeddings).
+# Off by default since it pulls in an embedding model at startup.
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "0") == "1"
+if SEMANTIC_CACHE_ENABLED:
+    try:
+        import numpy as np
+        from fastembed import TextEmbedding
+    except ImportError:
+        raise RuntimeError("SEMANTIC_CACHE=1 requires `pip install numpy fastembed`")
+
+    embedder = TextEmbedding("sentence-transformers/all-MiniLM-L6-v2")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await http_client.aclose()
+    log_listener.stop()
 
-app = FastAPI(title="Adi Voice To-Do Backend")
 
-# CORS so frontend (localhost or Vercel) can call us
+app = FastAPI(title="Adi Voice To-Do Backend", lifespan=lifespan)
+
+
+# CORS so frontend (localhost or Vercel) can call us.
+# FRONTEND_ORIGIN is a comma-separated list, e.g. your Vercel URL.
+FRONTEND_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("FRONTEND_ORIGIN", "http://localhost:3000").split(",")
+    if origin.strip()
+]
+logger.info("CORS allowed origins: %s", ", ".join(FRONTEND_ORIGINS))
+
+# Explicit lists let the middleware use a fixed header set, and max_age lets
+# browsers cache the preflight instead of repeating it.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],   # for prod you can restrict to your Vercel URL
+    allow_origins=FRONTEND_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
+    max_age=86400,
 )
 
 # ---------- Models ----------
@@ -35,90 +99,464 @@ class ParseRequest(BaseModel):
     text: str
 
 
-# ---------- Helpers ----------
+class Target(BaseModel):
+    mode: Optional[Literal["by_index", "by_match", "all"]] = None
+    index: Optional[int] = None
+    match_query: Optional[str] = None
+
+
+class IntentData(BaseModel):
+    title: Optional[str] = None
+    scheduledTime: Optional[str] = None
+    # Nullable in the tool schema (the examples send null); null becomes "low"
+    priority: Optional[Literal["high", "medium", "low"]] = "low"
+    status: Optional[Literal["pending", "done"]] = None
 
-def build_system_prompt() -> str:
-    today_str = date.today().isoformat()
-    return f"""
-You are an intent parser for a voice-first to-do list application.
-
-TODAY'S DATE: {today_str}
-
-User speaks natural language commands, e.g.:
-
-- "Show me all high priority tasks"
-- "Create a task to fix the bugs tomorrow at 3pm"
-- "Delete the task about compliances"
-- "Push the analytics task to next Monday"
-- "Mark the third task as done"
-- "Delete task 2"
-
-Return a SINGLE JSON OBJECT with this shape:
-
-{{
-  "operation": "create" | "update" | "delete" | "filter" | "noop",
-  "target": {{
-    "mode": "by_index" | "by_match" | "all" | null,
-    "index": number | null,
-    "match_query": string | null
-  }} | null,
-  "data": {{
-    "title": string | null,
-    "scheduledTime": string | null,
-    "priority": "high" | "medium" | "low" | null,
-    "status": "pending" | "done" | null
-  }}
-}}
+    @field_validator("priority", mode="before")
+    @classmethod
+    def default_priority(cls, v):
+        # model sends null when the user didn't say a priority
+        return "low" if v is None else v
 
+
+class Intent(BaseModel):
+    operation: Literal["create", "update", "delete", "filter", "noop"]
+    target: Optional[Target] = None
+    data: IntentData = Field(default_factory=IntentData)
+
+    @field_validator("data", mode="before")
+    @classmethod
+    def default_data(cls, v):
+        return {} if v is None else v
+
+
+# Declared as the response model so FastAPI serializes through pydantic-core
+# instead of jsonable_encoder + json.dumps.
+class ParseResponse(BaseModel):
+    intent: Intent
+
+
+# ---------- Helpers ----------
+
+# Kept byte-identical across requests, with the date in a separate message
+# after it. Note that OpenAI only caches prompts of 1024+ tokens, and this
+# prefix (prompt + examples + tool schema, ~900 tokens) is below that, so it
+# isn't cached today; the stable layout only pays off if the prefix grows.
+STATIC_SYSTEM_PROMPT = """You parse voice commands for a to-do app. Always call emit_intent.
 Rules:
+- create: target=null; title=short summary of the task; priority defaults to "low"; status "pending" unless already done.
+- update/delete: target by_index (1-based index) for "task 2"/"third task", else by_match with a short title phrase. Update fills only the changed data fields; the rest null.
+- Requests to show/filter tasks, and anything unrelated to tasks: operation="noop", target=null, all data null.
+- scheduledTime: ISO-8601 UTC like "2025-11-18T09:00:00Z", relative dates from TODAY'S DATE, else null."""
+
+
+# The intent schema is handed to the model as a forced function call, so the
+# arguments always come back as JSON in the shape of `Intent`.
+INTENT_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "emit_intent",
+        "description": "Emit the structured intent for the user's command.",
+        "parameters": Intent.model_json_schema(),
+    },
+}
+INTENT_TOOL_CHOICE = {"type": "function", "function": {"name": "emit_intent"}}
+
+
+def _example(n: int, text: str, intent: dict) -> list[dict]:
+    call_id = f"example_{n}"
+    return [
+        {"role": "user", "content": text},
+        {
+            "role": "assistant",
+            "tool_calls": [{
+                "id": call_id,
+                "type": "function",
+                "function": {
+                    "name": "emit_intent",
+                    "arguments": json.dumps(intent, separators=(",", ":")),
+                },
+            }],
+        },
+        {"role": "tool", "tool_call_id": call_id, "content": "ok"},
+    ]
+
+
+_NO_DATA = {"title": None, "scheduledTime": None, "priority": None, "status": None}
+
+# Few-shot examples go in the messages array rather than the prompt text.
+# They're static too, so they stay inside the cacheable prefix.
+FEW_SHOT_MESSAGES = [
+    *_example(1, "create a task to fix the login bug", {
+        "operation": "create", "target": None,
+        "data": {**_NO_DATA, "title": "Fix login bug", "priority": "low", "status": "pending"},
+    }),
+    *_example(2, "mark the third task as done", {
+        "operation": "update",
+        "target": {"mode": "by_index", "index": 3, "match_query": None},
+        "data": {**_NO_DATA, "status": "done"},
+    }),
+    *_example(3, "delete the task about compliances", {
+        "operation": "delete",
+        "target": {"mode": "by_match", "index": None, "match_query": "compliances"},
+        "data": _NO_DATA,
+    }),
+    *_example(4, "show me all high priority tasks", {
+        "operation": "noop", "target": None, "data": _NO_DATA,
+    }),
+]
+
+
+# (next local midnight as a timestamp, today's ISO date). Recomputed only
+# once the day rolls over, so the hot path is a single time.time() compare.
+_today_cache: list = [0.0, ""]
+
+
+def today_iso() -> str:
+    now = time.time()
+    if now >= _today_cache[0]:
+        today = date.today()
+        midnight = datetime.combine(today + timedelta(days=1), datetime.min.time())
+        _today_cache[0] = midnight.timestamp()
+        _today_cache[1] = today.isoformat()
+    return _today_cache[1]
+
+
+# Message dicts shared by every request; the SDK only reads them, so only the
+# user message has to be built per call.
+PREFIX_MESSAGES = (
+    {"role": "system", "content": STATIC_SYSTEM_PROMPT},
+    *FEW_SHOT_MESSAGES,
+)
+
+
+@lru_cache(maxsize=2)
+def _date_message_for(today_str: str) -> dict:
+    return {"role": "system", "content": f"TODAY'S DATE: {today_str}"}
+
 
-1. If the user is creating a task:
-   - operation = "create"
-   - target = null
-   - data.title = a short, meaningful summary (not just repeating the command)
-   - If they mention time or date, convert to ISO 8601 in UTC, e.g. "2025-11-18T09:00:00Z".
-   - If they say "tomorrow", "next Monday", etc, interpret relative to TODAY'S DATE above.
-   - If priority not clearly specified, set data.priority = "low".
-   - status defaults to "pending" unless clearly done/completed.
-
-2. If they delete a specific task by number like "delete the 3rd task" or "delete task 2":
-   - operation = "delete"
-   - target.mode = "by_index"
-   - target.index = that 1-based index (integer)
-   - data can be empty (all fields null).
-
-3. If they delete by description like "delete the task about compliances":
-   - operation = "delete"
-   - target.mode = "by_match"
-   - target.match_query = short phrase to search in titles
-   - target.index = null
-
-4. If they update one task, e.g. "mark task 2 as done", "push the bug fix task to tomorrow":
-   - operation = "update"
-   - Pick either by_index or by_match same as above.
-   - Fill only the fields in data that should change.
-   - If they just say "mark task 2 as done", then:
-       data.status = "done"
-       other fields null.
-
-5. If they only want to filter or show tasks, e.g. "show all high priority tasks":
-   - You can set operation = "filter"
-   - But for now, just use:
-       operation = "noop"
-       target = null
-       data fields null
-   The frontend will handle filtering locally by reusing the spoken text.
-
-6. If you truly cannot understand or it's not about tasks at all:
-   - operation = "noop"
-   - target = null
-   - all data fields null.
-
-Important:
-- ALWAYS respond with valid JSON, no comments, no trailing commas.
-- Do NOT wrap JSON in backticks or text like "Here is the JSON".
-- scheduledTime must be either a valid ISO-8601 string like "2025-11-18T09:00:00Z" or null.
-"""
+def build_messages(user_text: str) -> list[dict]:
+    return [
+        *PREFIX_MESSAGES,
+        _date_message_for(today_iso()),
+        {"role": "user", "content": user_text},
+    ]
+
+
+# Model routing: short, keyword-led commands ("remove the bug task", "mark
+# payments done") can go to a cheaper/faster model; anything longer or
+# free-form (creates with titles and times) stays on the default model.
+# Non-reasoning chat models only: requests send temperature=0, which
+# reasoning models (gpt-5*, o-series) reject.
+DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # or gpt-4.1-mini etc.
+FAST_MODEL = os.getenv("OPENAI_FAST_MODEL", DEFAULT_MODEL)  # e.g. gpt-4.1-nano
+FAST_ROUTE_MAX_WORDS = 6
+FAST_ROUTE_KEYWORDS = frozenset(
+    {"delete", "remove", "mark", "complete", "finish", "done", "priority", "show", "list"}
+)
+CREATE_VERBS = frozenset({"add", "create", "schedule", "remind", "new"})
+
+
+def is_simple_command(user_text: str) -> bool:
+    words = re.findall(r"[a-z0-9']+", user_text.lower())
+    return (
+        len(words) <= FAST_ROUTE_MAX_WORDS
+        and any(w in FAST_ROUTE_KEYWORDS for w in words)
+        and not any(w in CREATE_VERBS for w in words)
+    )
+
+
+def choose_model(user_text: str) -> str:
+    is_simple = is_simple_command(user_text)
+    model = FAST_MODEL if is_simple else DEFAULT_MODEL
+    logger.info("route model=%s simple=%s", model, is_simple)
+    return model
+
+
+# An intent is ~100 tokens; the cap bounds latency/cost if generation runs away
+MAX_OUTPUT_TOKENS = int(os.getenv("MAX_OUTPUT_TOKENS", "256"))
+
+
+async def stream_model_output(user_text: str):
+    """
+    Streams the emit_intent arguments as they are generated, yielding JSON
+    text deltas.
+    """
+    completion = await client.chat.completions.create(
+        model=choose_model(user_text),
+        tools=[INTENT_TOOL],
+        tool_choice=INTENT_TOOL_CHOICE,
+        parallel_tool_calls=False,
+        messages=build_messages(user_text),
+        temperature=0,
+        max_completion_tokens=MAX_OUTPUT_TOKENS,
+        stream=True,
+    )
+    async for chunk in completion:
+        if not chunk.choices:
+            continue
+        # Only the first call's arguments make up the intent; deltas for any
+        # other call carry a different index.
+        for call in chunk.choices[0].delta.tool_calls or ():
+            if call.index == 0 and call.function and call.function.arguments:
+                yield call.function.arguments
+
+
+# Exact-match cache of parsed intents. With temperature=0 the same utterance
+# on the same day yields the same intent, so repeats skip the LLM entirely.
+# The date is part of the key so "tomorrow" etc. don't go stale at midnight.
+INTENT_CACHE_SIZE = 2048
+_intent_cache: "OrderedDict[tuple[str, str], dict]" = OrderedDict()
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def get_cached_intent(user_text: str) -> Optional[dict]:
+    key = (normalize_text(user_text), today_iso())
+    intent = _intent_cache.get(key)
+    if intent is not None:
+        _intent_cache.move_to_end(key)
+    return intent
+
+
+def cache_intent(user_text: str, intent: dict) -> None:
+    key = (normalize_text(user_text), today_iso())
+    _intent_cache[key] = intent
+    _intent_cache.move_to_end(key)
+    if len(_intent_cache) > INTENT_CACHE_SIZE:
+        _intent_cache.popitem(last=False)
+
+
+# Semantic cache: "complete task 2" and "set task 2 to done" should map to the
+# same cached intent. Only non-delete intents without free text (titles, match
+# queries, times) are stored, and the numbers, priority/status, operation and
+# negation words in the utterance must match exactly, so "task 2" never
+# answers for "task 3" and "don't mark task 2 done" never for "mark task 2 done".
+SEMANTIC_CACHE_SIZE = 4096
+SEMANTIC_THRESHOLD = 0.92
+
+_NUMBER_WORDS = [
+    ("one", "first"), ("two", "second"), ("three", "third"), ("four", "fourth"),
+    ("five", "fifth"), ("six", "sixth"), ("seven", "seventh"),
+    ("eight", "eighth"), ("nine", "ninth"), ("ten", "tenth"),
+]
+# Each slot word maps to the canonical tokens it contributes to the
+# signature: task numbers, priority/status, the operation class, and negation.
+_SLOT_CANON: dict[str, tuple[str, ...]] = {
+    w: (str(n),) for n, words in enumerate(_NUMBER_WORDS, 1) for w in words
+}
+_SLOT_CANON.update({
+    "high": ("high",), "medium": ("medium",), "low": ("low",),
+    "done": ("done",), "finished": ("done",), "pending": ("pending",),
+    "complete": ("update", "done"), "completed": ("update", "done"),
+    "finish": ("update", "done"), "undone": ("pending",),
+    "delete": ("delete",), "remove": ("delete",), "clear": ("delete",), "erase": ("delete",),
+    "mark": ("update",), "set": ("update",), "change": ("update",), "make": ("update",),
+    "update": ("update",), "move": ("update",), "push": ("update",),
+    "show": ("noop",), "list": ("noop",), "display": ("noop",),
+    "not": ("not",), "no": ("not",), "don't": ("not",), "dont": ("not",),
+    "never": ("not",), "undo": ("not",), "cancel": ("not",),
+    "all": ("all",), "every": ("all",),
+})
+_SLOT_WORDS = re.compile(r"\d+|\b(?:" + "|".join(_SLOT_CANON) + r")\b")
+
+
+def slot_signature(norm: str) -> tuple[str, ...]:
+    tokens = set()
+    for w in _SLOT_WORDS.findall(norm):
+        tokens.update(_SLOT_CANON.get(w, (w,)))
+    return tuple(sorted(tokens))
+
+
+class SemanticCache:
+    def __init__(self, size: int, dim: int = 384):
+        self.size = size
+        self.embeddings = np.zeros((size, dim), dtype=np.float32)
+        self.signatures: list[Optional[tuple[str, ...]]] = [None] * size
+        self.intents: list[Optional[dict]] = [None] * size
+        self.last_used = np.zeros(size, dtype=np.int64)
+        self.count = 0
+        self.clock = 0
+
+    def lookup(self, emb, signature: tuple[str, ...]) -> Optional[dict]:
+        if self.count == 0:
+            return None
+        sims = self.embeddings[: self.count] @ emb
+        for i in np.argsort(sims)[::-1]:
+            if sims[i] < SEMANTIC_THRESHOLD:
+                break
+            if self.signatures[i] == signature:
+                self.clock += 1
+                self.last_used[i] = self.clock
+                return self.intents[i]
+        return None
+
+    def add(self, emb, signature: tuple[str, ...], intent: dict) -> None:
+        if self.count < self.size:
+            i = self.count
+            self.count += 1
+        else:
+            i = int(np.argmin(self.last_used))  # evict least recently used
+        self.clock += 1
+        self.embeddings[i] = emb
+        self.signatures[i] = signature
+        self.intents[i] = intent
+        self.last_used[i] = self.clock
+
+    def clear(self) -> None:
+        self.count = 0
+        self.clock = 0
+        self.signatures = [None] * self.size
+        self.intents = [None] * self.size
+        self.last_used[:] = 0
+
+
+semantic_cache = SemanticCache(SEMANTIC_CACHE_SIZE) if SEMANTIC_CACHE_ENABLED else None
+
+
+def _embed(norm: str):
+    emb = next(iter(embedder.embed([norm]))).astype(np.float32)
+    return emb / np.linalg.norm(emb)
+
+
+def is_semantically_cacheable(intent: dict) -> bool:
+    # A false hit on a delete is unrecoverable, so deletes only ever come from
+    # the exact-match cache.
+    target = intent.get("target") or {}
+    data = intent["data"]
+    return (
+        intent["operation"] != "delete"
+        and target.get("match_query") is None
+        and data.get("title") is None
+        and data.get("scheduledTime") is None
+    )
+
+
+async def find_cached_intent(user_text: str) -> tuple[Optional[dict], Optional["np.ndarray"]]:
+    """
+    Returns (intent, embedding). On a semantic-cache miss the embedding is
+    returned so remember_intent can store it without embedding the text again.
+    """
+    intent = get_cached_intent(user_text)
+    if intent is not None or semantic_cache is None:
+        return intent, None
+
+    norm = normalize_text(user_text)
+    emb = await asyncio.to_thread(_embed, norm)
+    return semantic_cache.lookup(emb, slot_signature(norm)), emb
+
+
+async def remember_intent(user_text: str, intent: dict, emb=None) -> None:
+    cache_intent(user_text, intent)
+    if semantic_cache is None or not is_semantically_cacheable(intent):
+        return
+
+    norm = normalize_text(user_text)
+    if emb is None:
+        emb = await asyncio.to_thread(_embed, norm)
+    semantic_cache.add(emb, slot_signature(norm), intent)
+
+
+# Local fast path: the most common commands follow a handful of fixed
+# templates ("delete task 2", "mark the third task as done", "show high
+# priority tasks"), so those are parsed here without calling the model.
+_INDEX_WORDS = {w: n for n, words in enumerate(_NUMBER_WORDS, 1) for w in words}
+_IDX = r"(\d+(?:st|nd|rd|th)?|" + "|".join(_INDEX_WORDS) + r")"
+_TASK_REF = rf"(?:the )?(?:task (?:number )?{_IDX}|{_IDX} task)"
+_STATUS = {
+    "done": "done", "complete": "done", "completed": "done", "finished": "done",
+    "pending": "pending", "not done": "pending", "undone": "pending",
+}
+_STATUS_RE = "(" + "|".join(sorted(_STATUS, key=len, reverse=True)) + ")"
+
+
+def _task_index(m: re.Match) -> int:
+    word = m[1] or m[2]
+    if word[0].isdigit():
+        return int(word.rstrip("stndrh"))
+    return _INDEX_WORDS[word]
+
+
+def _by_index(m: re.Match) -> dict:
+    return {"mode": "by_index", "index": _task_index(m), "match_query": None}
+
+
+LOCAL_PATTERNS = [
+    (
+        re.compile(rf"^(?:delete|remove) {_TASK_REF}$"),
+        lambda m: {"operation": "delete", "target": _by_index(m)},
+    ),
+    (
+        re.compile(rf"^(?:mark|set) {_TASK_REF} (?:as )?{_STATUS_RE}$"),
+        lambda m: {"operation": "update", "target": _by_index(m), "data": {"status": _STATUS[m[3]]}},
+    ),
+    (
+        re.compile(rf"^(?:complete|finish) {_TASK_REF}$"),
+        lambda m: {"operation": "update", "target": _by_index(m), "data": {"status": "done"}},
+    ),
+    (
+        re.compile(
+            rf"^(?:set|change|make|mark) {_TASK_REF}(?: priority)? (?:to |as )?"
+            r"(high|medium|low)(?: priority)?$"
+        ),
+        lambda m: {"operation": "update", "target": _by_index(m), "data": {"priority": m[3]}},
+    ),
+    (
+        re.compile(r"^(?:show|list|display)(?: me)?(?: all| only)?(?: the)?(?: (?:high|medium|low) priority)? tasks$"),
+        lambda m: {"operation": "noop"},
+    ),
+]
+
+
+def match_local_intent(user_text: str) -> Optional[dict]:
+    norm = normalize_text(user_text).rstrip(".!?")
+    for pattern, build in LOCAL_PATTERNS:
+        m = pattern.match(norm)
+        if m:
+            return Intent.model_validate(build(m)).model_dump(mode="json")
+    return None
+
+
+async def _request_intent(user_text: str, emb=None) -> dict:
+    # Streamed even here so a slow generation doesn't hit the read timeout
+    raw = "".join([delta async for delta in stream_model_output(user_text)])
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Raw model output: %s", raw)
+
+    # Parse + validate + apply defaults in one pass
+    intent = Intent.model_validate_json(raw).model_dump(mode="json")
+    await remember_intent(user_text, intent, emb)
+    return intent
+
+
+# Requests for the same utterance that arrive while one is already waiting on
+# the model (retries, double-fired transcripts) share that call instead of
+# each paying for their own. Different utterances already run concurrently
+# over the shared HTTP/2 connection, so there's nothing to gain by holding
+# them back to batch. Only /parse-intent coalesces; /parse-intent/stream
+# forwards each caller's own deltas, so it always makes its own call.
+_inflight: dict[tuple[str, str], asyncio.Task] = {}
+
+
+async def fetch_intent(user_text: str, emb=None) -> dict:
+    key = (normalize_text(user_text), today_iso())
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_request_intent(user_text, emb))
+        _inflight[key] = task
+
+        def finished(t: asyncio.Task) -> None:
+            _inflight.pop(key, None)
+            # Mark the exception retrieved; if every waiter has disconnected,
+            # nobody else will, and asyncio would warn about it.
+            if not t.cancelled():
+                t.exception()
+
+        task.add_done_callback(finished)
+    # shield so one client disconnecting doesn't cancel the call for the rest
+    return await asyncio.shield(task)
 
 
 # ---------- Routes ----------
@@ -127,41 +565,90 @@ Important:
 def root():
     return {"status": "ok", "message": "Adi voice to-do backend running"}
 
-@app.post("/parse-intent")
+@app.post("/parse-intent", response_model=ParseResponse)
 async def parse_intent(body: ParseRequest):
     """
     Takes raw text from the frontend and returns a structured intent
     that the frontend will use to perform CRUD on the in-memory task list.
     """
     user_text = body.text.strip()
-    print("Received text from frontend:", user_text)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Received text from frontend: %s", user_text)
 
     try:
-        system_prompt = build_system_prompt()
-
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",  # or gpt-4.1-mini, gpt-5-mini etc.
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_text},
-            ],
-            temperature=0,
-        )
-
-        raw = completion.choices[0].message.content
-        print("Raw model output:", raw)
-
-        intent = json.loads(raw)
-
-        # Basic sanity defaults / cleanup
-        data = intent.get("data", {})
-        if data.get("priority") is None:
-            data["priority"] = "low"  # default low
-        intent["data"] = data
+        cached, emb = match_local_intent(user_text), None
+        if cached is None:
+            cached, emb = await find_cached_intent(user_text)
+        if cached is not None:
+            return {"intent": cached}
 
+        intent = await fetch_intent(user_text, emb)
         return {"intent": intent}
 
     except Exception as e:
-        print("Error in /parse-intent:", e)
+        logger.exception("Error in /parse-intent: %s", e)
         raise HTTPException(status_code=500, detail="LLM parsing failed")
+
+
+@app.post("/parse-intent/stream")
+async def parse_intent_stream(body: ParseRequest):
+    """
+    Same as /parse-intent, but streams NDJSON so the frontend can react at
+    the first token: one {"delta": ...} line per model chunk, then a final
+    {"intent": ...} line (or {"error": ...} if parsing failed).
+    """
+    user_text = body.text.strip()
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Received text from frontend (stream): %s", user_text)
+
+    async def events():
+        parts = []
+        try:
+            cached, emb = match_local_intent(user_text), None
+            if cached is None:
+                cached, emb = await find_cached_intent(user_text)
+            if cached is not None:
+                yield orjson.dumps({"intent": cached}) + b"\n"
+                return
+
+            async for delta in stream_model_output(user_text):
+                parts.append(delta)
+                yield orjson.dumps({"delta": delta}) + b"\n"
+
+            intent = Intent.model_validate_json("".join(parts)).model_dump(mode="json")
+            await remember_intent(user_text, intent, emb)
+            yield orjson.dumps({"intent": intent}) + b"\n"
+
+        except Exception as e:
+            logger.exception("Error in /parse-intent/stream: %s", e)
+            yield orjson.dumps({"error": "LLM parsing failed"}) + b"\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+# Admin endpoint, only registered when ADMIN_TOKEN is set; callers must send
+# it in the X-Admin-Token header.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+if ADMIN_TOKEN:
+    @app.post("/parse-intent/cache/clear")
+    def clear_intent_cache(x_admin_token: str = Header(default="")):
+        if not secrets.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+            raise HTTPException(status_code=401, detail="Invalid admin token")
+
+        cleared = len(_intent_cache)
+        _intent_cache.clear()
+        if semantic_cache is not None:
+            semantic_cache.clear()
+        return {"status": "ok", "cleared": cleared}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
@@ -0,0 +1,21 @@
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from main import is_simple_command  # noqa: E402
+
+
+def test_short_keyword_commands_are_simple():
+    assert is_simple_command("remove the bug task")
+    assert is_simple_command("mark task 2 done.")
+
+
+def test_keywords_inside_other_words_do_not_match():
+    assert not is_simple_command("add market research task")
+    assert not is_simple_command("create a playlist task")
+    assert not is_simple_command("buy milk at the market")
+    assert not is_simple_command("schedule a shower at 9")
+
+
+def test_create_verbs_stay_on_default_model():
+    assert not is_simple_command("add a task to show the demo")